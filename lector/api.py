@@ -1,15 +1,129 @@
 """The javascript source for the Kindle API
 """
 
-API_SCRIPT = """
-var KindleBookMetadata = function(title, authors, asin) {
-    return {
-        title: title,
-        authors: authors,
-        asin: asin
-    };
-};
+# A minimal Promise implementation for browsers without native Promises
+# (e.g. PhantomJS). Only the parts used by `API_SCRIPT` are provided.
+PROMISE_SCRIPT = """
+if (typeof window.Promise === 'undefined') {
+    window.Promise = (function() {
+        var PENDING = 0, FULFILLED = 1, REJECTED = 2;
+
+        function Promise(executor) {
+            var self = this, called = false;
+            this._state = PENDING;
+            this._value = void 0;
+            this._handlers = [];
+            try {
+                executor(function(value) {
+                    if (!called) { called = true; _resolve(self, value); }
+                }, function(reason) {
+                    if (!called) { called = true; _settle(self, REJECTED, reason); }
+                });
+            } catch (e) {
+                if (!called) { called = true; _settle(self, REJECTED, e); }
+            }
+        }
+
+        function _settle(promise, state, value) {
+            var handlers = promise._handlers;
+            promise._state = state;
+            promise._value = value;
+            promise._handlers = null;
+            handlers.forEach(function(handler) { _handle(promise, handler); });
+        }
+
+        // Adopts the state of thenables (including jQuery Deferreds)
+        function _resolve(promise, value) {
+            var then, called = false;
+            if (value === promise) {
+                return _settle(promise, REJECTED,
+                               new TypeError('A promise cannot resolve to itself'));
+            }
+            if (value !== null &&
+                (typeof value === 'object' || typeof value === 'function')) {
+                try {
+                    then = value.then;
+                    if (typeof then === 'function') {
+                        then.call(value, function(v) {
+                            if (!called) { called = true; _resolve(promise, v); }
+                        }, function(r) {
+                            if (!called) { called = true; _settle(promise, REJECTED, r); }
+                        });
+                        return;
+                    }
+                } catch (e) {
+                    if (!called) { called = true; _settle(promise, REJECTED, e); }
+                    return;
+                }
+            }
+            _settle(promise, FULFILLED, value);
+        }
+
+        function _handle(promise, handler) {
+            setTimeout(function() {
+                var fulfilled = promise._state === FULFILLED;
+                var callback = fulfilled ? handler.on_fulfilled : handler.on_rejected;
+                if (typeof callback !== 'function') {
+                    (fulfilled ? handler.resolve : handler.reject)(promise._value);
+                    return;
+                }
+                try {
+                    handler.resolve(callback(promise._value));
+                } catch (e) {
+                    handler.reject(e);
+                }
+            }, 0);
+        }
+
+        Promise.prototype.then = function(on_fulfilled, on_rejected) {
+            var self = this;
+            return new Promise(function(resolve, reject) {
+                var handler = {on_fulfilled: on_fulfilled, on_rejected: on_rejected,
+                               resolve: resolve, reject: reject};
+                if (self._state === PENDING) {
+                    self._handlers.push(handler);
+                } else {
+                    _handle(self, handler);
+                }
+            });
+        };
+
+        Promise.resolve = function(value) {
+            if (value instanceof Promise) {
+                return value;
+            }
+            return new Promise(function(resolve) { resolve(value); });
+        };
+
+        Promise.reject = function(reason) {
+            return new Promise(function(resolve, reject) { reject(reason); });
+        };
+
+        Promise.all = function(values) {
+            return new Promise(function(resolve, reject) {
+                var results = new Array(values.length),
+                    remaining = values.length;
+                if (!remaining) {
+                    resolve(results);
+                    return;
+                }
+                values.forEach(function(value, i) {
+                    Promise.resolve(value).then(function(result) {
+                        results[i] = result;
+                        if (--remaining === 0) {
+                            resolve(results);
+                        }
+                    }, reject);
+                });
+            });
+        };
+
+        return Promise;
+    })();
+}
+"""
 
+API_SCRIPT = """
 var KindleBookProgress = function(positions, locs, page_nums) {
     return {
         positions: positions,
@@ -20,22 +134,59 @@ var KindleBookProgress = function(positions, locs, page_nums) {
 
 var KindleAPI = (function() {
 
-    function _get_new_kmm(modules) {
+    // The app modules required to compute a book's reading progress
+    var PROGRESS_MODULES = [Kindle.MODULE.DB_CLIENT,
+                            Kindle.MODULE.SERVICE_CLIENT,
+                            Kindle.MODULE.METRICS_MANAGER,
+                            Kindle.MODULE.PageNumberManager];
+
+    // ModuleManager shared by every call; app modules are registered lazily
+    var _shared_kmm = null;
+
+    function _copy_registration(to, from, modules) {
+        modules.forEach(function(a) {
+            if (!to.isModuleRegistered(a) && from.isModuleInitialized(a)) {
+                to.registerModule(a, from.getModuleSync(a));
+            }
+        });
+    }
+
+    /*
+     * Construct a new ModuleManager with `modules` registered from `base`
+     * (the page's KindleModuleManager by default).
+     */
+    function _get_new_kmm(modules, base) {
         modules = modules || [];
+        base = base || KindleModuleManager;
         var kmm = KindleModuleManagerFactory();
         // This attr makes sense seeing as BOOK_METADATA and BOOK_FRAGMAP made
         // it into the KindleModuleManager.
         kmm.BOOK_CONTEXT = "book_context";
+        _copy_registration(kmm, base, modules);
+        return kmm;
+    }
 
-        function copy_registration(to, from, modules) {
-            modules.forEach(function(a) {
-                if (!to.isModuleRegistered(a) && from.isModuleInitialized(a)) {
-                    to.registerModule(a, from.getModuleSync(a));
-                }
-            });
+    /*
+     * Return the shared ModuleManager with (at least) `modules` registered.
+     */
+    function _get_shared_kmm(modules) {
+        modules = modules || [];
+        if (_shared_kmm === null) {
+            _shared_kmm = _get_new_kmm(modules);
+        } else {
+            _copy_registration(_shared_kmm, KindleModuleManager, modules);
         }
-        copy_registration(kmm, KindleModuleManager, modules);
-        return kmm;
+        return _shared_kmm;
+    }
+
+    /*
+     * Return a new ModuleManager for loading a book's modules with the app
+     * modules of the shared ModuleManager registered. Each book fetch uses
+     * its own so concurrent fetches do not collide on the book-specific
+     * module slots and the book data can be collected once the fetch is done.
+     */
+    function _get_book_kmm() {
+        return _get_new_kmm(PROGRESS_MODULES, _get_shared_kmm(PROGRESS_MODULES));
     }
 
     function _load_book_modules(asin, kmm) {
@@ -43,61 +194,58 @@ var KindleAPI = (function() {
         kmm.BOOK_CONTEXT = "book_context";
 
         // Detach any attached Book data leftover
-        for (var module in [kmm.BOOK_FRAGMAP, kmm.BOOK_METADATA, kmm.BOOK_CONTEXT]) {
+        [kmm.BOOK_FRAGMAP, kmm.BOOK_METADATA, kmm.BOOK_CONTEXT].forEach(function(module) {
             if (kmm.isModuleRegistered(module)) {
                 kmm.detachModule(module);
             }
-        }
+        });
 
-        var modules_ready = $.Deferred();
-        kmm.getModuleSync(kmm.SERVICE_CLIENT)
-            .startReading({asin: asin})  // Submit ajax request for book context
-            .done(function(context) {  // Register modules using this context
-                kmm.registerModule(kmm.BOOK_CONTEXT, context);
-                var info = KindleReaderBookInfoProvider
-                                        .BookInfo({asin: null}, kmm);
-
-                var ncp = NetworkContentProvider.create({
-                    context: context,
-                    bookInfo: info,
-                    asin: asin
-                });
-                // Register metadata and fragmap
-                kmm.registerModuleWithDeferred(kmm.BOOK_METADATA, ncp.getMetadata());
-                kmm.registerModuleWithDeferred(kmm.BOOK_FRAGMAP, ncp.getFragmap());
-                // Return the three modules
-                kmm.getModuleList([kmm.BOOK_CONTEXT, kmm.BOOK_METADATA, kmm.BOOK_FRAGMAP])
-                    .done(function(mods) {
-                        modules_ready.resolve(mods[kmm.BOOK_CONTEXT],
-                                mods[kmm.BOOK_METADATA],
-                                mods[kmm.BOOK_FRAGMAP]);
-                    });
-            });
-        return modules_ready.promise();
-    }
+        // Submit ajax request for book context
+        var context_ready = Promise.resolve(
+            kmm.getModuleSync(kmm.SERVICE_CLIENT).startReading({asin: asin}));
+        return context_ready.then(function(context) {
+            // Register modules using this context
+            kmm.registerModule(kmm.BOOK_CONTEXT, context);
+            var info = KindleReaderBookInfoProvider
+                                    .BookInfo({asin: null}, kmm);
 
-    /*
-     * Convert the larger metadata object returned by the AppDb to a
-     * KindleBookMetadata object (just title, author list, and ASIN).
-     */
-    function _from_db_book(db_book) {
-        return KindleBookMetadata(db_book.title, db_book.authors, db_book.asin);
+            var ncp = NetworkContentProvider.create({
+                context: context,
+                bookInfo: info,
+                asin: asin
+            });
+            // Register metadata and fragmap
+            kmm.registerModuleWithDeferred(kmm.BOOK_METADATA, ncp.getMetadata());
+            kmm.registerModuleWithDeferred(kmm.BOOK_FRAGMAP, ncp.getFragmap());
+            // Return the three modules
+            return Promise.resolve(kmm.getModuleList(
+                    [kmm.BOOK_CONTEXT, kmm.BOOK_METADATA, kmm.BOOK_FRAGMAP]))
+                .then(function(mods) {
+                    return [mods[kmm.BOOK_CONTEXT],
+                            mods[kmm.BOOK_METADATA],
+                            mods[kmm.BOOK_FRAGMAP]];
+                });
+        });
     }
 
     /*
      * ASYNC
-     * Return an Array of KindleBookMetadata objects representing the 
+     * Return an Array of KindleBookMetadata objects representing the books
+     * in the user's library.
+     *
+     * KindleBookMetadata objects are plain objects projected from the AppDb's
+     * larger metadata object (just title, author list, and ASIN).
      */
     function get_library_metadata() {
-        var kmm = _get_new_kmm([Kindle.MODULE.DB_CLIENT]);
-        var books_ready = $.Deferred();
-        kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
-            .getAppDb()
-            .getAllBooks()
-            .done(function(books) {
-                books_ready.resolve($.map(books, _from_db_book));
+        var kmm = _get_shared_kmm([Kindle.MODULE.DB_CLIENT]);
+        return Promise.resolve(kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
+                .getAppDb()
+                .getAllBooks())
+            .then(function(books) {
+                return books.map(function(book) {
+                    return {title: book.title, authors: book.authors, asin: book.asin};
+                });
             });
-        return books_ready.promise();
     }
 
     /*
@@ -105,14 +253,50 @@ var KindleAPI = (function() {
      * Return the KindleBookMetadata object for the book associated with `asin`
      */
     function get_book_metadata(asin) {
-        var kmm = _get_new_kmm([Kindle.MODULE.DB_CLIENT]);
-        var book_ready = $.Deferred();
-        kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
-            .getAppDb()
-            .getBook(asin, function(db_book) {
-                book_ready.resolve(_from_db_book(db_book));
-            });
-        return book_ready;
+        var kmm = _get_shared_kmm([Kindle.MODULE.DB_CLIENT]);
+        return new Promise(function(resolve, reject) {
+            kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
+                .getAppDb()
+                .getBook(asin, function(db_book) {
+                    if (!db_book) {
+                        reject(new Error('No book with ASIN ' + asin));
+                        return;
+                    }
+                    resolve({title: db_book.title,
+                             authors: db_book.authors,
+                             asin: db_book.asin});
+                });
+        });
+    }
+
+    /*
+     * ASYNC
+     * Return the [start, current, end] page numbers for the book described
+     * by `info` and `context` or undefined if page numbers are unavailable.
+     */
+    function _get_page_nums(kmm, info, context, current) {
+        if (!context.pageNumberUrl) {
+            return Promise.resolve(void 0);
+        }
+        info.getContext = function() { return context; };
+        var pgnum_dfd = kmm
+                    .getModuleSync(Kindle.MODULE.PageNumberManager)
+                    .getPageNumbers(info);
+        return Promise.resolve(pgnum_dfd).then(function(pageConverter) {
+            var range_obj = pageConverter.getPageNumberRanges().arabic;
+            var range = [range_obj.minPage, range_obj.maxPage];
+            // Ensure position is within the valid page range
+            var position_range = range.map(pageConverter.positionFromPageNumber);
+            if (position_range[0] == -1 || position_range[1] == -1) {
+                // Page conversion error
+                return void 0;
+            }
+            var corrected_position = (current < position_range[0]) ? position_range[0]
+                                    : (current > position_range[1]) ? position_range[1]
+                                    : current;
+            var curr_page = pageConverter.pageNumberFromPosition(corrected_position);
+            return [range_obj.minPage, parseInt(curr_page), range_obj.maxPage];
+        });
     }
 
     /*
@@ -120,62 +304,32 @@ var KindleAPI = (function() {
      * Return the KindleBookProgress object for the book associated with `asin`
      */
     function get_book_progress(asin) {
-        // A new ModuleManager is constructed for each call to this function
-        // so that calls can be made concurrently (e.g. in
-        // get_library_progress())
-        var kmm = _get_new_kmm([Kindle.MODULE.DB_CLIENT,
-                                Kindle.MODULE.SERVICE_CLIENT,
-                                Kindle.MODULE.METRICS_MANAGER,
-                                Kindle.MODULE.PageNumberManager]);
-
-        var book_ready = $.Deferred();
-        _load_book_modules(asin, kmm)
-            .done(function(context, metadata) {
-                var info = KindleReaderBookInfoProvider
-                                        .BookInfo({asin: metadata.asin}, kmm);
-                var current = info.getFurthestPositionReadData().position,
-                    start = metadata.startPosition,
-                    end = metadata.endPosition;
-                var positions = [start, current, end];
-
-                // Convert positions to Location and Page Number (if available)
-                var locs_dfd = $.map(positions, info.getLocationConverter().locationFromPosition);
-                var loc_conversions = $.when.apply($, locs_dfd);
-
-                var page_conversions = $.Deferred();
-                if (context.pageNumberUrl) {
-                    info.getContext = function() { return context; };
-                    var pgnum_dfd = kmm
-                                .getModuleSync(Kindle.MODULE.PageNumberManager)
-                                .getPageNumbers(info);
-                    pgnum_dfd.done(function(pageConverter) {
-                        var range_obj = pageConverter.getPageNumberRanges().arabic;
-                        var range = [range_obj.minPage, range_obj.maxPage];
-                        // Ensure position is within the valid page range
-                        var position_range = $.map(range, pageConverter.positionFromPageNumber);
-                        if (position_range[0] == -1 || position_range[1] == -1) {
-                            // Page conversion error
-                            page_conversions.resolve(void 0);
-                        } else {
-                            var corrected_position = (current < position_range[0]) ? position_range[0]
-                                                    : (current > position_range[1]) ? position_range[1]
-                                                    : current;
-                            var curr_page = pageConverter.pageNumberFromPosition(corrected_position);
-                            page_conversions.resolve([range_obj.minPage,
-                                                        parseInt(curr_page),
-                                                        range_obj.maxPage]);
-                        }
-                    });
-                } else {
-                    page_conversions.resolve(void 0);
-                }
+        // Each book has its own ModuleManager so that calls can be made
+        // concurrently (e.g. in get_library_progress())
+        var kmm = _get_book_kmm();
 
-                $.when(loc_conversions, page_conversions)
-                    .done(function (locs, page_nums) {
-                        book_ready.resolve(KindleBookProgress(positions, locs, page_nums));
-                    });
-            });
-        return book_ready.promise();
+        return _load_book_modules(asin, kmm).then(function(mods) {
+            var context = mods[0],
+                metadata = mods[1];
+            var info = KindleReaderBookInfoProvider
+                                    .BookInfo({asin: metadata.asin}, kmm);
+            var current = info.getFurthestPositionReadData().position,
+                start = metadata.startPosition,
+                end = metadata.endPosition;
+            var positions = [start, current, end];
+
+            // Convert positions to Location and Page Number (if available).
+            // The conversions are independent so both are started before
+            // either is awaited.
+            var loc_conversions = Promise.all(
+                    positions.map(info.getLocationConverter().locationFromPosition));
+            var page_conversions = _get_page_nums(kmm, info, context, current);
+
+            return Promise.all([loc_conversions, page_conversions])
+                .then(function(conversions) {
+                    return KindleBookProgress(positions, conversions[0], conversions[1]);
+                });
+        });
     }
 
     /*
@@ -184,26 +338,108 @@ var KindleAPI = (function() {
      * library and the value is the associated KindleBookProgress object.
      */
     function get_library_progress() {
-        var books_ready = $.Deferred();
-        get_library_metadata().done(function(books) {
-            var asins = $.map(books, function(book) { return book.asin; });
-            $.when.apply($, $.map(asins, get_book_progress)).done(function() {
-                var progress_list = arguments;
-                var ret = {};
-                asins.map(function(asin, i) {
-                    ret[asin] = progress_list[i];
+        var kmm = _get_shared_kmm(PROGRESS_MODULES);
+        return Promise.resolve(kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
+                .getAppDb()
+                .getAllBooks())
+            .then(function(books) {
+                var asins = books.map(function(book) { return book.asin; });
+                var progress_list = asins.map(get_book_progress);
+                return Promise.all(progress_list).then(function(progress_list) {
+                    var ret = {};
+                    asins.forEach(function(asin, i) {
+                        ret[asin] = progress_list[i];
+                    });
+                    return ret;
                 });
-                books_ready.resolve(ret);
             });
-        });
-        return books_ready.promise();
+    }
+
+    /*
+     * ASYNC
+     * Return an object with the progress of the books last accessed after
+     * `since`, mapping ASINs to KindleBookProgress objects, as `progress` and
+     * the latest access time seen as `timestamp`.
+     *
+     * Books without an access time are always included.
+     */
+    function get_library_progress_since(since) {
+        var kmm = _get_shared_kmm(PROGRESS_MODULES);
+        return Promise.resolve(kmm.getModuleSync(Kindle.MODULE.DB_CLIENT)
+                .getAppDb()
+                .getAllBooks())
+            .then(function(books) {
+                var timestamp = since;
+                var asins = [];
+                books.forEach(function(book) {
+                    var accessed = book.lastAccessed;
+                    if (accessed === undefined || accessed === null) {
+                        asins.push(book.asin);
+                    } else if (accessed > since) {
+                        asins.push(book.asin);
+                        timestamp = Math.max(timestamp, accessed);
+                    }
+                });
+                return Promise.all(asins.map(get_book_progress))
+                    .then(function(progress_list) {
+                        var progress = {};
+                        asins.forEach(function(asin, i) {
+                            progress[asin] = progress_list[i];
+                        });
+                        return {progress: progress, timestamp: timestamp};
+                    });
+            });
+    }
+
+    /*
+     * ASYNC
+     * Return an Array of KindleBookMetadata objects for the books associated
+     * with each of `asins`
+     */
+    function get_books_metadata(asins) {
+        return Promise.all(asins.map(get_book_metadata));
+    }
+
+    /*
+     * ASYNC
+     * Return an Array of KindleBookProgress objects for the books associated
+     * with each of `asins`
+     */
+    function get_books_progress(asins) {
+        // Repeated ASINs share a single fetch
+        var fetches = {};
+        return Promise.all(asins.map(function(asin) {
+            if (!fetches.hasOwnProperty(asin)) {
+                fetches[asin] = get_book_progress(asin);
+            }
+            return fetches[asin];
+        }));
+    }
+
+    /*
+     * ASYNC
+     * Return an object with the library's KindleBookMetadata Array as
+     * `metadata` and its ASIN to KindleBookProgress mapping as `progress`
+     */
+    function get_library_dump() {
+        return Promise.all([get_library_metadata(), get_library_progress()])
+            .then(function(results) {
+                return {metadata: results[0], progress: results[1]};
+            });
     }
 
     return {
+        get_library_dump: get_library_dump,
         get_book_progress: get_book_progress,
+        get_books_progress: get_books_progress,
         get_library_progress: get_library_progress,
+        get_library_progress_since: get_library_progress_since,
         get_book_metadata: get_book_metadata,
+        get_books_metadata: get_books_metadata,
         get_library_metadata: get_library_metadata
     };
 })();
+
+// Install the API on the page so it persists between script executions
+window.KindleAPI = KindleAPI;
 """
@@ -1,13 +1,118 @@
 """Interface for extracting Kindle Library data from Kindle Cloud Reader."""
 from . import api
 
+import atexit
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict, deque
 from textwrap import dedent
 from contextlib import contextmanager
 
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver import PhantomJS
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from selenium.webdriver.support.wait import WebDriverWait
+# NOTE: selenium is imported only where it is used so that the data classes
+# may be used without paying its import cost.
+
+
+# Book metadata is effectively immutable so it is cached on disk between
+# sessions. The full library listing is refreshed after `_META_CACHE_TTL`
+# seconds to pick up new purchases.
+_META_CACHE_PATH = os.path.expanduser('~/.lector/metadata.json')
+_META_CACHE_TTL = 24 * 60 * 60
+
+# `os.rename` only overwrites atomically on POSIX; `os.replace` is Python 3.3+
+_replace = getattr(os, 'replace', os.rename)
+
+# Scripts for each KindleAPI call, built once at import. Each expects the
+# JSON-encoded call arguments to be interpolated with `%`. If the API
+# is not installed on the page (e.g. after a navigation), `_API_NOT_INSTALLED`
+# is returned instead. If the call fails, an object mapping `_API_ERROR` to
+# the error message is returned. Calls still running in the page (e.g. when a
+# timed-out call is retried) are awaited rather than started again.
+_API_NOT_INSTALLED = u'__lector_api_not_installed__'
+_API_ERROR = u'__lector_error__'
+_API_CALL_TEMPLATE = (
+    "var done = arguments[0];\n"
+    "if (!window.hasOwnProperty('KindleAPI')) { done('%(not_installed)s'); }\n"
+    "else {\n"
+    "  var args = [%%s], key = '%(api_call)s' + JSON.stringify(args);\n"
+    "  var pending = window.__lectorPending || (window.__lectorPending = {});\n"
+    "  if (!pending.hasOwnProperty(key)) {\n"
+    "    var clear = function() { delete pending[key]; };\n"
+    "    pending[key] = KindleAPI.%(api_call)s.apply(KindleAPI, args);\n"
+    "    pending[key].then(clear, clear);\n"
+    "  }\n"
+    "  pending[key].then(done, function(e) {\n"
+    "    done({'%(error)s': String(e && e.message || e)}); });\n"
+    "}\n")
+_API_CALL_SCRIPTS = {
+    name: _API_CALL_TEMPLATE % {'api_call': name,
+                                'not_installed': _API_NOT_INSTALLED,
+                                'error': _API_ERROR}
+    for name in ('get_book_metadata', 'get_books_metadata',
+                 'get_book_progress', 'get_books_progress',
+                 'get_library_metadata', 'get_library_progress',
+                 'get_library_progress_since', 'get_library_dump')
+}
+
+# Waits for the reader header, the Module Manager, and the DB Client by polling
+# inside the page then installs the API so the whole wait costs one
+# round-trip. Readiness is cached on the page as a promise so later waits
+# (e.g. when a pooled session is checked out) resolve immediately.
+# Takes the timeout in milliseconds as its argument. Promises are polyfilled
+# first for browsers that lack them.
+_READY_SCRIPT = api.PROMISE_SCRIPT + dedent(ur"""
+    var timeout_ms = arguments[0], done = arguments[1];
+    if (!window.hasOwnProperty('__lectorReady')) {
+        window.__lectorReady = new Promise(function(resolve) {
+            var pending = false;
+            var poll = setInterval(function() {
+                if (pending ||
+                    document.getElementById('kindleReader_header') === null ||
+                    !window.hasOwnProperty('KindleModuleManager') ||
+                    !KindleModuleManager
+                        .isModuleInitialized(Kindle.MODULE.DB_CLIENT)) {
+                    return;
+                }
+                pending = true;
+                KindleModuleManager
+                    .getModuleSync(Kindle.MODULE.DB_CLIENT)
+                    .getAppDb()
+                    .getAllBooks()
+                    .done(function(books) {
+                        pending = false;
+                        if (books.length) {
+                            clearInterval(poll);
+                            clearTimeout(expiry);
+                            resolve();
+                        }
+                    });
+            }, 20);
+            // Give up and allow a later wait to start polling afresh
+            var expiry = setTimeout(function() {
+                clearInterval(poll);
+                delete window.__lectorReady;
+            }, timeout_ms);
+        });
+    }
+    window.__lectorReady.then(function() {
+        if (!window.hasOwnProperty('KindleAPI')) {
+            install_api();
+        }
+        done(true);
+    });
+    """) + u'function install_api() {\n%s\n}\n' % api.API_SCRIPT
+
+# Scripts checking whether all or any of the element ids passed as the first
+# argument are present in the current document
+_IDS_PRESENT_SCRIPTS = {
+    require_all: dedent(ur"""
+        return arguments[0].%s(function(id) {
+            return document.getElementById(id) !== null;
+        });
+        """) % ('every' if require_all else 'some')
+    for require_all in (True, False)
+}
 
 
 class Error(Exception):
@@ -40,29 +145,47 @@ class KindleBook(object):
     authors: An iterable of the book's authors.
   """
 
+  __slots__ = ('asin', 'title', 'authors', '_str', '_repr')
+
   def __init__(self, asin, title, authors=()):
     self.asin = unicode(asin)
     self.title = unicode(title)
-    self.authors = tuple(unicode(author) for author in authors)
+    self.authors = tuple(map(unicode, authors))
+    # String representations are built on first use
+    self._str = None
+    self._repr = None
+
+  # Classes with __slots__ need explicit state to be pickled on Python 2
+  def __getstate__(self):
+    return (self.asin, self.title, self.authors)
+
+  def __setstate__(self, state):
+    self.asin, self.title, self.authors = state
+    self._str = None
+    self._repr = None
 
   def __str__(self):
-    if not self.authors:
-      ret = u'"{}"'.format(self.title)
-    elif len(self.authors) == 1:
-      ret = u'"{}" by {}'.format(self.title, self.authors[0])
-    elif len(self.authors) == 2:
-      ret = u'"{}" by {} and {}'.format(
-          self.title, self.authors[0], self.authors[1])
-    else:
-      ret = u'"{}" by {}, and {}'.format(
-          self.title, u', '.join(self.authors[:-1]), self.authors[-1])
-    return ret.encode('utf8')
+    if self._str is None:
+      if not self.authors:
+        ret = u'"{}"'.format(self.title)
+      elif len(self.authors) == 1:
+        ret = u'"{}" by {}'.format(self.title, self.authors[0])
+      elif len(self.authors) == 2:
+        ret = u'"{}" by {} and {}'.format(
+            self.title, self.authors[0], self.authors[1])
+      else:
+        ret = u'"{}" by {}, and {}'.format(
+            self.title, u', '.join(self.authors[:-1]), self.authors[-1])
+      self._str = ret.encode('utf8')
+    return self._str
 
   def __repr__(self):
-    author_str = u', '.join(u'"%s"' % author for author in self.authors)
-    return (u'Book(asin={}, title="{}", authors=[{}])'
-            .format(self.asin, self.title, author_str)
-            .encode('utf8'))
+    if self._repr is None:
+      author_str = u', '.join(u'"%s"' % author for author in self.authors)
+      self._repr = (u'Book(asin={}, title="{}", authors=[{}])'
+                    .format(self.asin, self.title, author_str)
+                    .encode('utf8'))
+    return self._repr
 
 
 class ReadingProgress(object):
@@ -105,10 +228,23 @@ class ReadingProgress(object):
     positions and locations is something like 150 to 1.
   """
 
+  __slots__ = ('positions', 'locs', 'page_nums', '_key', '_hash')
+
   def __init__(self, positions, locs, page_nums=None):
     self.positions = tuple(positions)
     self.locs = tuple(locs)
     self.page_nums = tuple(page_nums) if page_nums is not None else None
+    # Used for equality and hashing
+    self._key = (self.positions, self.locs, self.page_nums)
+    self._hash = hash(self._key)
+
+  # Classes with __slots__ need explicit state to be pickled on Python 2. The
+  # hash is recomputed as it may differ between processes.
+  def __getstate__(self):
+    return self._key
+
+  def __setstate__(self, state):
+    self.__init__(*state)
 
   def has_page_progress(self):
     """Returns whether page numbering data is available."""
@@ -116,22 +252,43 @@ class ReadingProgress(object):
     return self.page_nums is not None
 
   def __eq__(self, other):
-    return (self.positions == other.positions and
-            self.locs == other.locs and
-            self.page_nums == other.page_nums)
+    if self is other:
+      return True
+    if not isinstance(other, ReadingProgress):
+      return NotImplemented
+    # Unequal hashes rule out equality without comparing each tuple
+    if self._hash != other._hash:
+      return False
+    return self._key == other._key
 
   def __ne__(self, other):
-    return not self.__eq__(other)
+    equal = self.__eq__(other)
+    return equal if equal is NotImplemented else not equal
+
+  def __hash__(self):
+    return self._hash
 
+  # NOTE: Positions are the most granular measure so they alone determine
+  # ordering. Page numbers may also be unavailable.
   def __gt__(self, other):
-    return (self.positions[1] > other.positions[1] and
-            self.locs[1] > other.locs[1] and
-            self.page_nums[1] > other.page_nums[1])
+    if not isinstance(other, ReadingProgress):
+      return NotImplemented
+    return self.positions[1] > other.positions[1]
+
+  def __ge__(self, other):
+    if not isinstance(other, ReadingProgress):
+      return NotImplemented
+    return self.positions[1] >= other.positions[1]
 
   def __lt__(self, other):
-    return (self.positions[1] < other.positions[1] and
-            self.locs[1] < other.locs[1] and
-            self.page_nums[1] < other.page_nums[1])
+    if not isinstance(other, ReadingProgress):
+      return NotImplemented
+    return self.positions[1] < other.positions[1]
+
+  def __le__(self, other):
+    if not isinstance(other, ReadingProgress):
+      return NotImplemented
+    return self.positions[1] <= other.positions[1]
 
   def __str__(self):
     if self.has_page_progress():
@@ -148,13 +305,21 @@ class ReadingProgress(object):
       return 'ReadingProgress(Loc=(%d of %d))' % (self.locs[1], self.locs[2])
 
 
-class _KindleCloudReaderBrowser(PhantomJS):
+class _KindleCloudReaderBrowser(object):
   """A selenium webdriver wrapper for interacting with Kindle Cloud Reader.
 
+  Attribute lookups not defined here are delegated to the underlying
+  webdriver so the wrapper may be used wherever a webdriver is expected.
+
   Args:
     username: The email address associated with the Kindle account.
     password: The password associated with the Kindle account.
     user_agent: The user agent to be used for the browser.
+    driver: The browser engine to drive. One of 'chrome' (headless Chrome)
+        or 'phantomjs'.
+    profile_path (optional): A directory in which the browser keeps its
+        profile, including Amazon's login cookies, between sessions. Only one
+        browser may use a profile at a time.
   """
 
   _CLOUD_READER_URL = u'https://read.amazon.com'
@@ -164,30 +329,151 @@ class _KindleCloudReaderBrowser(PhantomJS):
       'AppleWebKit/537.36 (KHTML, like Gecko) '
       'Chrome/44.0.2403.155 Safari/537.36')
 
-  def __init__(self, username, password, user_agent=_USER_AGENT):
-    # Kindle Cloud Reader does not broadcast support for PhantomJS
-    # This is easily circumvented by modifying the User Agent
-    dcap = DesiredCapabilities.PHANTOMJS.copy()
-    dcap['phantomjs.page.settings.userAgent'] = user_agent
-
-    super(_KindleCloudReaderBrowser, self).__init__(
-        desired_capabilities=dcap, service_args=['--disk-cache=false'])
-
-    self.set_window_size(1920, 1080)
-    self.set_script_timeout(5)
+  # Maps each driver to its capabilities for `_USER_AGENT`; built on first use
+  _CAPABILITIES = {}
+  # Profile directories held by a live browser. A browser profile can only be
+  # used by one browser at a time.
+  _PROFILES_IN_USE = set()
+
+  def __init__(self, username, password, user_agent=_USER_AGENT,
+               driver='chrome', profile_path=None):
+    from selenium.webdriver import Chrome, PhantomJS
+
+    if profile_path is not None:
+      profile_path = os.path.abspath(profile_path)
+      if profile_path in self._PROFILES_IN_USE:
+        raise BrowserError(
+            'Profile %s is already in use by another browser.' % profile_path)
+    capabilities = self._capabilities(driver, user_agent, profile_path)
+
+    self._profile_path = profile_path
+    if profile_path is not None:
+      self._PROFILES_IN_USE.add(profile_path)
+    try:
+      if driver == 'chrome':
+        self._driver = Chrome(desired_capabilities=capabilities)
+      else:
+        service_args = ['--disk-cache=false']
+        if profile_path is not None:
+          if not os.path.isdir(profile_path):
+            os.makedirs(profile_path)
+          service_args.append('--cookies-file=%s' %
+                              os.path.join(profile_path, 'cookies.txt'))
+        self._driver = PhantomJS(desired_capabilities=capabilities,
+                                 service_args=service_args)
+    except Exception:
+      self._PROFILES_IN_USE.discard(profile_path)
+      raise
 
     self._uname = username
     self._pword = password
+    self._home_loaded = False
+
+    # Quit the browser, releasing its profile, if it cannot reach the reader
+    try:
+      self.set_window_size(1920, 1080)
+      self.set_script_timeout(5)
+      self._init_browser()
+    except Exception:
+      self.quit()
+      raise
+
+  @classmethod
+  def _capabilities(cls, driver, user_agent, profile_path=None):
+    """Returns the desired capabilities for a driver.
+
+    Capabilities for the default user agent without a profile are built once
+    and shared by every instance.
+
+    Args:
+      driver: The browser engine to drive. One of 'chrome' or 'phantomjs'.
+      user_agent: The user agent to be used for the browser.
+      profile_path: The browser profile directory or None.
+
+    Raises:
+      BrowserError: If `driver` is not supported.
+    """
+    shared = user_agent == cls._USER_AGENT and profile_path is None
+    if shared and driver in cls._CAPABILITIES:
+      return cls._CAPABILITIES[driver]
+
+    from selenium.webdriver import ChromeOptions
+    from selenium.webdriver.common.desired_capabilities import (
+        DesiredCapabilities)
+
+    if driver == 'chrome':
+      options = ChromeOptions()
+      options.add_argument('--headless=new')
+      options.add_argument('--disable-gpu')
+      options.add_argument('--no-sandbox')
+      options.add_argument('--user-agent=%s' % user_agent)
+      # Images are not needed to extract data
+      options.add_argument('--blink-settings=imagesEnabled=false')
+      if profile_path is not None:
+        options.add_argument('--user-data-dir=%s' % profile_path)
+      capabilities = options.to_capabilities()
+      # Return from navigation once the DOM is ready. KCR's long-running
+      # requests would otherwise hold up `get` until they settle and the
+      # reader's readiness is awaited explicitly regardless.
+      capabilities['pageLoadStrategy'] = 'eager'
+    elif driver == 'phantomjs':
+      # Kindle Cloud Reader does not broadcast support for PhantomJS
+      # This is easily circumvented by modifying the User Agent
+      capabilities = DesiredCapabilities.PHANTOMJS.copy()
+      capabilities['phantomjs.page.settings.userAgent'] = user_agent
+    else:
+      raise BrowserError('Unsupported driver "%s"' % driver)
 
-    self._init_browser()
+    if shared:
+      cls._CAPABILITIES[driver] = capabilities
+    return capabilities
 
-  def _wait(self, timeout=10):
-    """Returns a `WebDriverWait` instance set to `timeout` seconds."""
+  def __getattr__(self, name):
+    # NOTE: Guards against infinite recursion if the driver failed to start
+    if name == '_driver':
+      raise AttributeError(name)
+    return getattr(self._driver, name)
 
-    return WebDriverWait(self, timeout=timeout)
+  def quit(self):
+    """Quits the browser and releases its profile."""
+    try:
+      self._driver.quit()
+    finally:
+      self._PROFILES_IN_USE.discard(self._profile_path)
+
+  def _wait(self, timeout=10, poll_frequency=0.05):
+    """Returns a `WebDriverWait` instance set to `timeout` seconds.
+
+    Conditions are polled every `poll_frequency` seconds rather than
+    selenium's default of 0.5s so waits return soon after they are met.
+    """
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    return WebDriverWait(self, timeout=timeout, poll_frequency=poll_frequency)
+
+  def _wait_for_ids(self, ids, timeout=10, require_all=True):
+    """Waits for elements to be present in the current document.
+
+    Each poll checks every id with a single script execution.
+
+    Args:
+      ids: An iterable of element ids.
+      timeout: The number of seconds to wait.
+      require_all: Whether all of `ids` must be present. If False, any one
+          is sufficient.
+
+    Raises:
+      TimeoutException: If the elements are not present within `timeout`.
+    """
+    script = _IDS_PRESENT_SCRIPTS[require_all]
+    ids = list(ids)
+    self._wait(timeout).until(lambda br: br.execute_script(script, ids))
 
   def _init_browser(self):
-    """Initializes a browser and navigates to the KCR reader page."""
+    """Initializes a browser and navigates to the KCR reader page.
+
+    Navigation is skipped if the browser is already on the reader page.
+    """
 
     self._to_reader_home()
     self._to_reader_frame()
@@ -203,26 +489,35 @@ class _KindleCloudReaderBrowser(PhantomJS):
       BrowserError: If the KCR homepage could not be loaded.
       ConnectionError: If there was a connection error.
     """
+    from selenium.common.exceptions import TimeoutException
+
     # NOTE: Prevents QueryInterface error caused by getting a URL
     # while switched to an iframe
     self.switch_to_default_content()
+    if (self._home_loaded and
+        self.current_url.startswith(_KindleCloudReaderBrowser._CLOUD_READER_URL)
+        and self.title == u'Kindle Cloud Reader'):
+      return
+
+    self._home_loaded = False
     self.get(_KindleCloudReaderBrowser._CLOUD_READER_URL)
 
     if self.title == u'Problem loading page':
       raise ConnectionError
 
     # Wait for either the login page or the reader to load
-    login_or_reader_loaded = lambda br: (
-        br.find_elements_by_id('amzn_kcr') or
-        br.find_elements_by_id('KindleLibraryIFrame'))
-    self._wait(5).until(login_or_reader_loaded)
+    self._wait_for_ids(('amzn_kcr', 'KindleLibraryIFrame'), timeout=5,
+                       require_all=False)
 
+    # The login page is skipped if the profile holds a valid session
+    titles = (u'Amazon.com Sign In', u'Kindle Cloud Reader')
     try:
-      self._wait(5).until(lambda br: br.title == u'Amazon.com Sign In')
+      self._wait(5).until(lambda br: br.title in titles)
     except TimeoutException:
       raise BrowserError('Failed to load Kindle Cloud Reader.')
-    else:
+    if self.title == u'Amazon.com Sign In':
       self._login()
+    self._home_loaded = True
 
   def _login(self, max_tries=2):
     """Logs in to Kindle Cloud Reader.
@@ -234,14 +529,15 @@ class _KindleCloudReaderBrowser(PhantomJS):
       BrowserError: If method called when browser not at a signin URL.
       LoginError: If login unsuccessful after `max_tries` attempts.
     """
+    from selenium.common.exceptions import TimeoutException
 
+    self._home_loaded = False
     if not self.current_url.startswith(_KindleCloudReaderBrowser._SIGNIN_URL):
       raise BrowserError(
           'Current url "%s" is not a signin url ("%s")' %
           (self.current_url, _KindleCloudReaderBrowser._SIGNIN_URL))
 
-    email_field_loaded = lambda br: br.find_elements_by_id('ap_email')
-    self._wait().until(email_field_loaded)
+    self._wait_for_ids(('ap_email',))
     tries = 0
     while tries < max_tries:
       # Enter the username
@@ -277,41 +573,22 @@ class _KindleCloudReaderBrowser(PhantomJS):
     """Navigate to the KindleReader iframe."""
 
     reader_frame = 'KindleReaderIFrame'
-    frame_loaded = lambda br: br.find_elements_by_id(reader_frame)
-    self._wait().until(frame_loaded)
+    self._wait_for_ids((reader_frame,))
 
     self.switch_to.frame(reader_frame)  # pylint: disable=no-member
 
-    reader_loaded = lambda br: br.find_elements_by_id('kindleReader_header')
-    self._wait().until(reader_loaded)
-
   def _wait_for_js(self):
     """Wait for the Kindle Cloud Reader JS modules to initialize.
 
-    These modules provide the interface used to execute API queries.
+    These modules provide the interface used to execute API queries. Once
+    they are ready, the KindleAPI is installed on the page.
     """
-    # Wait for the Module Manager to load
-    mod_mgr_script = ur"return window.hasOwnProperty('KindleModuleManager');"
-    mod_mgr_loaded = lambda br: br.execute_script(mod_mgr_script)
-    self._wait(5).until(mod_mgr_loaded)
-
-    # Wait for the DB Client to load
-    db_client_script = dedent(ur"""
-        var done = arguments[0];
-        if (!window.hasOwnProperty('KindleModuleManager') ||
-            !KindleModuleManager
-                .isModuleInitialized(Kindle.MODULE.DB_CLIENT)) {
-           done(false);
-        } else {
-            KindleModuleManager
-                .getModuleSync(Kindle.MODULE.DB_CLIENT)
-                .getAppDb()
-                .getAllBooks()
-                .done(function(books) { done(!!books.length); });
-        }
-        """)
-    db_client_loaded = lambda br: br.execute_async_script(db_client_script)
-    self._wait(5).until(db_client_loaded)
+    timeout = 10
+    self.set_script_timeout(timeout)
+    try:
+      self.execute_async_script(_READY_SCRIPT, timeout * 1000)
+    finally:
+      self.set_script_timeout(5)
 
 
 class KindleCloudReaderAPI(object):
@@ -320,17 +597,95 @@ class KindleCloudReaderAPI(object):
   Args:
     username: The email address associated with the Kindle account.
     password: The password associated with the Kindle account.
+    driver: The browser engine to drive. One of 'chrome' (headless Chrome)
+        or 'phantomjs'.
+    metadata_cache: The path of the JSON file used to cache book metadata
+        between sessions. Caching is disabled if None.
+    profile_path (optional): A directory in which the browser keeps its
+        profile between sessions. Reusing a profile lets later sessions skip
+        logging in. Only one instance may use a profile at a time.
   """
 
-  def __init__(self, username, password):
-    self._browser = _KindleCloudReaderBrowser(username, password)
+  def __init__(self, username, password, driver='chrome',
+               metadata_cache=_META_CACHE_PATH, profile_path=None):
+    self._browser = _KindleCloudReaderBrowser(
+        username, password, driver=driver, profile_path=profile_path)
+    self._uname = username
+    self._meta_cache_path = metadata_cache
+    self._meta_cache = {}
+    self._meta_cache_mtime = None
+    # Objects built from API results, keyed by ASIN, so that unchanged
+    # results are returned as the same instances
+    self._books = {}
+    self._progress = {}
+    # Shares author strings between books as most authors recur throughout a
+    # library
+    self._authors = {}
+
+  def _read_metadata_cache(self):
+    """Returns the contents of the metadata cache file.
+
+    The cache maps each username to a dict with the keys:
+      updated: The time the full library was last fetched or None.
+      books: A list of KindleBookMetadata objects.
+
+    The file is only re-parsed when its modification time changes.
+    """
+    if self._meta_cache_path is None:
+      return {}
+    try:
+      mtime = os.stat(self._meta_cache_path).st_mtime
+    except OSError:
+      return {}
+    if mtime != self._meta_cache_mtime:
+      try:
+        with open(self._meta_cache_path) as cache_file:
+          self._meta_cache = json.load(cache_file)
+      except (IOError, ValueError):
+        self._meta_cache = {}
+      self._meta_cache_mtime = mtime
+    return self._meta_cache
+
+  def _get_cached_metadata(self):
+    """Returns the current user's metadata cache entry."""
+
+    return self._read_metadata_cache().get(
+        self._uname, {'updated': None, 'books': []})
+
+  def _set_cached_metadata(self, entry):
+    """Writes the current user's metadata cache entry to disk.
+
+    Failure to write the cache is not fatal so errors are ignored.
+    """
+    if self._meta_cache_path is None:
+      return
+    cache = self._read_metadata_cache()
+    cache[self._uname] = entry
+    cache_dir = os.path.dirname(self._meta_cache_path)
+    try:
+      if cache_dir and not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+      # Write to a temporary file and rename it over the cache so a crash
+      # mid-write cannot leave a truncated cache behind
+      tmp_path = self._meta_cache_path + '.tmp'
+      with open(tmp_path, 'w') as cache_file:
+        json.dump(cache, cache_file, separators=(',', ':'))
+        cache_file.flush()
+        os.fsync(cache_file.fileno())
+      _replace(tmp_path, self._meta_cache_path)
+      self._meta_cache = cache
+      self._meta_cache_mtime = os.stat(self._meta_cache_path).st_mtime
+    except (IOError, OSError):
+      pass
+
+  _API_CALL_TRIES = 3
 
   def _get_api_call(self, function_name, *args):
-    """Runs an api call with javascript-formatted arguments.
+    """Runs an api call.
 
     Args:
       function_name: The name of the KindleAPI call to run.
-      *args: Javascript-formatted arguments to pass to the API call.
+      *args: JSON-serializable arguments to pass to the API call.
 
     Returns:
       The result of the API call.
@@ -338,51 +693,77 @@ class KindleCloudReaderAPI(object):
     Raises:
       APIError: If the API call fails or times out.
     """
-    api_call = dedent("""
-        var done = arguments[0];
-        KindleAPI.%(api_call)s(%(args)s).always(function(a) {
-            done(a);
-        });
-    """) % {
-        'api_call': function_name,
-        'args': ', '.join(args)
-    }
-    script = '\n'.join((api.API_SCRIPT, api_call))
+    from selenium.common.exceptions import TimeoutException
+
+    script = (_API_CALL_SCRIPTS[function_name] %
+              ', '.join(json.dumps(arg) for arg in args))
+    timeout = 5
+    attempt = 0
+    reinstalled = False
     try:
-      return self._browser.execute_async_script(script)
-    except TimeoutException:
-      # FIXME: KCR will occassionally not load library and fall over
-      raise APIError
+      while True:
+        try:
+          ret = self._browser.execute_async_script(script)
+        except TimeoutException:
+          attempt += 1
+          if attempt == self._API_CALL_TRIES:
+            raise APIError('API call %s timed out.' % function_name)
+          # KCR is occasionally slow to load the library so halt any pending
+          # loads and wait on the running call with a larger budget rather
+          # than re-navigating
+          self._browser.execute_script('window.stop();')
+          timeout = 10 * (attempt + 1)
+          self._browser.set_script_timeout(timeout)
+          continue
+        if ret != _API_NOT_INSTALLED:
+          break
+        if reinstalled:
+          raise APIError('KindleAPI could not be installed.')
+        # The reader has been reloaded or navigated away from
+        try:
+          self._browser._init_browser()  # pylint: disable=protected-access
+        except TimeoutException:
+          raise APIError('Failed to reload Kindle Cloud Reader.')
+        reinstalled = True
+        # Reinstalling the API resets the script timeout
+        self._browser.set_script_timeout(timeout)
+    finally:
+      self._browser.set_script_timeout(5)
 
-  @staticmethod
-  def _kbm_to_book(kbm):
-    """Converts a KindleBookMetadata object to a `KindleBook` instance.
+    if isinstance(ret, dict) and _API_ERROR in ret:
+      raise APIError('API call %s failed: %s' %
+                     (function_name, ret[_API_ERROR]))
+    return ret
 
-    KindleBookMetadata is the Javascript object used by Kindle Cloud Reader to
-    represent book metadata.
+  def _to_book(self, kbm):
+    """Returns the `KindleBook` for a KindleBookMetadata object.
 
-    Args:
-      kbm: A KindleBookMetadata object.
-
-    Returns:
-      A KindleBook instance corresponding to the KindleBookMetadata param.
+    The instance built for the same ASIN is reused if its metadata is
+    unchanged.
     """
-    return KindleBook(**kbm)  # pylint: disable=star-args
-
-  @staticmethod
-  def _kbp_to_progress(kbp):
-    """Converts a KindleBookProgress object to a `ReadingProgress` instance.
-
-    KindleBookProgress is the Javascript object used by Kindle Cloud Reader to
-    represent reading progress.
-
-    Args:
-      kbp: A KindleBookProgress object.
-
-    Returns:
-      A ReadingProgress instance constructed using the KindleBookMetadata param.
+    asin = kbm['asin']
+    authors = kbm.get('authors', ())
+    book = self._books.get(asin)
+    if (book is None or book.title != kbm['title'] or
+        list(book.authors) != list(authors)):
+      authors = [self._authors.setdefault(author, author) for author in authors]
+      book = self._books[asin] = KindleBook(asin, kbm['title'], authors)
+    return book
+
+  def _to_progress(self, asin, kbp):
+    """Returns the `ReadingProgress` for a KindleBookProgress object.
+
+    The instance built for the same ASIN is reused if its progress is
+    unchanged.
     """
-    return ReadingProgress(**kbp)  # pylint: disable=star-args
+    page_nums = kbp.get('page_nums')
+    key = (tuple(kbp['positions']), tuple(kbp['locs']),
+           tuple(page_nums) if page_nums is not None else None)
+    progress = self._progress.get(asin)
+    # pylint: disable=protected-access
+    if progress is None or progress._key != key:
+      progress = self._progress[asin] = ReadingProgress(*key)
+    return progress
 
   def get_book_metadata(self, asin):
     """Returns a book's metadata.
@@ -394,8 +775,49 @@ class KindleCloudReaderAPI(object):
       A `KindleBook` instance corresponding to the book associated with
       `asin`.
     """
-    kbm = self._get_api_call('get_book_metadata', '"%s"' % asin)
-    return KindleCloudReaderAPI._kbm_to_book(kbm)
+    return self.get_books_metadata([asin])[0]
+
+  def get_books_metadata(self, asins):
+    """Returns the metadata for several books.
+
+    Books missing from the metadata cache are fetched with a single API call.
+
+    Args:
+      asins: An iterable of the ASINs of the books to be queried.
+
+    Returns:
+      A list of `KindleBook` instances corresponding to the books associated
+      with `asins`, in the same order.
+    """
+    asins = list(asins)
+    entry = self._get_cached_metadata()
+    kbms = {kbm['asin']: kbm for kbm in entry['books']}
+    # Each missing book is only fetched once
+    missing = list(OrderedDict.fromkeys(
+        asin for asin in asins if asin not in kbms))
+    if missing:
+      fetched = self._get_api_call('get_books_metadata', missing)
+      kbms.update((kbm['asin'], kbm) for kbm in fetched)
+      entry['books'].extend(fetched)
+      self._set_cached_metadata(entry)
+    return [self._to_book(kbms[asin]) for asin in asins]
+
+  def _get_fresh_library_metadata(self):
+    """Returns the cached library metadata entry if it has not expired."""
+
+    entry = self._get_cached_metadata()
+    updated = entry['updated']
+    if updated is None or time.time() - updated > _META_CACHE_TTL:
+      return None
+    return entry
+
+  def _fetch_library_metadata(self):
+    """Fetches the library metadata and returns the updated cache entry."""
+
+    entry = {'updated': time.time(),
+             'books': self._get_api_call('get_library_metadata')}
+    self._set_cached_metadata(entry)
+    return entry
 
   def get_library_metadata(self):
     """Returns the metadata on all books in the kindle library.
@@ -404,8 +826,11 @@ class KindleCloudReaderAPI(object):
       A list of `KindleBook` instances corresponding to the books in the
       current user's library.
     """
-    return map(KindleCloudReaderAPI._kbm_to_book,
-               self._get_api_call('get_library_metadata'))
+    entry = self._get_fresh_library_metadata()
+    if entry is None:
+      entry = self._fetch_library_metadata()
+    to_book = self._to_book
+    return [to_book(kbm) for kbm in entry['books']]
 
   def get_book_progress(self, asin):
     """Returns the progress data available for a book.
@@ -420,8 +845,26 @@ class KindleCloudReaderAPI(object):
       A `ReadingProgress` instance corresponding to the book associated with
       `asin`.
     """
-    kbp = self._get_api_call('get_book_progress', '"%s"' % asin)
-    return KindleCloudReaderAPI._kbp_to_progress(kbp)
+    kbp = self._get_api_call('get_book_progress', asin)
+    return self._to_progress(asin, kbp)
+
+  def get_books_progress(self, asins):
+    """Returns the progress data available for several books.
+
+    All books are queried with a single API call.
+
+    Args:
+      asins: An iterable of the ASINs of the books to be queried.
+
+    Returns:
+      A mapping of ASINs to `ReadingProgress` instances corresponding to the
+      books associated with `asins`.
+    """
+    # Each book is only fetched once
+    asins = list(OrderedDict.fromkeys(asins))
+    kbps = self._get_api_call('get_books_progress', asins)
+    return {asin: self._to_progress(asin, kbp)
+            for asin, kbp in zip(asins, kbps)}
 
   def get_library_progress(self):
     """Returns the reading progress for all books in the kindle library.
@@ -431,22 +874,177 @@ class KindleCloudReaderAPI(object):
       books in the current user's library.
     """
     kbp_dict = self._get_api_call('get_library_progress')
-    return {asin: KindleCloudReaderAPI._kbp_to_progress(kbp)
-            for asin, kbp in kbp_dict.iteritems()}
+    return {asin: self._to_progress(asin, kbp)
+            for asin, kbp in kbp_dict.items()}
+
+  def get_library_progress_delta(self, since=0):
+    """Returns the reading progress for books accessed since a watermark.
+
+    Only books opened after `since` are queried so periodic polling need not
+    fetch the whole library. Books whose access time is unknown are always
+    returned.
+
+    Args:
+      since: The watermark returned by the previous call or 0 to fetch the
+          progress of the whole library.
+
+    Returns:
+      A 2-tuple of a mapping of ASINs to `ReadingProgress` instances for the
+      books accessed after `since` and the watermark for the next call.
+    """
+    delta = self._get_api_call('get_library_progress_since', since)
+    progress = {asin: self._to_progress(asin, kbp)
+                for asin, kbp in delta['progress'].items()}
+    return progress, delta['timestamp']
+
+  def get_library_dump(self):
+    """Returns the metadata and reading progress for the kindle library.
+
+    If the library metadata is not cached, both are fetched with a single API
+    call.
+
+    Returns:
+      A 2-tuple of the results of `get_library_metadata` and
+      `get_library_progress`.
+    """
+    if self._get_fresh_library_metadata() is not None:
+      return self.get_library_metadata(), self.get_library_progress()
+
+    dump = self._get_api_call('get_library_dump')
+    self._set_cached_metadata({'updated': time.time(),
+                               'books': dump['metadata']})
+    books = [self._to_book(kbm) for kbm in dump['metadata']]
+    progress = {asin: self._to_progress(asin, kbp)
+                for asin, kbp in dump['progress'].items()}
+    return books, progress
+
+  def iter_library_progress(self):
+    """Yields the reading progress for each book in the kindle library.
+
+    Unlike `get_library_progress`, each book is queried individually so
+    results are available as soon as each book's progress is fetched. The
+    library listing is always fetched afresh so recent purchases are included.
+
+    Yields:
+      (ASIN, `ReadingProgress`) pairs for the books in the current user's
+      library.
+    """
+    for kbm in self._fetch_library_metadata()['books']:
+      yield kbm['asin'], self.get_book_progress(kbm['asin'])
 
   def close(self):
     """End the browser session."""
     self._browser.quit()
 
+  def _close_quietly(self):
+    """End the browser session, ignoring errors from an unresponsive browser."""
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+      self.close()
+    except WebDriverException:
+      pass
+
+  def _refresh(self, max_tries=2):
+    """Returns the browser to the reader page, ready for API calls.
+
+    Args:
+      max_tries: The maximum number of attempts that will be made.
+
+    Returns:
+      Whether the browser session is usable.
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    for _ in range(max_tries):
+      try:
+        self._browser._init_browser()  # pylint: disable=protected-access
+      except (WebDriverException, Error):
+        continue
+      else:
+        return True
+    return False
+
+  # Maps (username, password digest, options) to a deque of idle sessions
+  # stored as (instance, last_used, max_idle_seconds) tuples
+  _SESSION_POOL = {}
+  # The maximum number of idle sessions kept per account
+  _MAX_IDLE_SESSIONS = 2
+
   @staticmethod
-  @contextmanager
-  def get_instance(*args, **kwargs):
-    """Context manager for an instance of `KindleCloudReaderAPI`."""
+  def _session_key(username, password, args, kwargs):
+    """Returns the `_SESSION_POOL` key for an account.
+
+    Args:
+      username: The email address associated with the Kindle account.
+      password: The password associated with the Kindle account.
+      args: A tuple of the further positional arguments the instance is
+          created with.
+      kwargs: A dict of the keyword arguments the instance is created with.
+    """
+    if isinstance(password, unicode):
+      password = password.encode('utf8')
+    return (username, hashlib.sha256(password).hexdigest(), args,
+            tuple(sorted(kwargs.items())))
+
+  @classmethod
+  def _evict_idle_sessions(cls):
+    """Closes and removes pooled sessions that have exceeded their idle time."""
+
+    now = time.time()
+    for idle in cls._SESSION_POOL.values():
+      for entry in list(idle):
+        inst, last_used, max_idle = entry
+        if now - last_used > max_idle:
+          idle.remove(entry)
+          inst._close_quietly()  # pylint: disable=protected-access
+
+  @classmethod
+  def shutdown_pool(cls):
+    """Closes all pooled browser sessions.
+
+    Called automatically at interpreter exit.
+    """
+    while cls._SESSION_POOL:
+      _, idle = cls._SESSION_POOL.popitem()
+      for inst, _, _ in idle:
+        inst._close_quietly()  # pylint: disable=protected-access
 
-    inst = KindleCloudReaderAPI(*args, **kwargs)
+  @classmethod
+  @contextmanager
+  def get_instance(cls, username, password, *args, **kwargs):
+    """Context manager for an instance of `KindleCloudReaderAPI`.
+
+    Logged-in sessions are pooled per account and constructor arguments so
+    subsequent calls for the same credentials skip browser startup and login.
+    Each instance is used by one context at a time. Pooled sessions are closed
+    after the `max_idle_seconds` keyword argument (600 by default) without use
+    or by calling `shutdown_pool`. Other arguments are passed to the
+    constructor.
+    """
+    max_idle_seconds = kwargs.pop('max_idle_seconds', 600)
+    cls._evict_idle_sessions()
+    key = cls._session_key(username, password, args, kwargs)
+    idle = cls._SESSION_POOL.setdefault(key, deque())
+    inst = None
+    # pylint: disable=protected-access
+    while idle and inst is None:
+      inst = idle.popleft()[0]
+      if not inst._refresh():
+        inst._close_quietly()
+        inst = None
+    if inst is None:
+      inst = cls(username, password, *args, **kwargs)
     try:
       yield inst
-    except Exception:
-      raise
     finally:
-      inst.close()
+      # The pool may have been shut down while the instance was in use
+      idle = cls._SESSION_POOL.get(key)
+      if idle is not None and len(idle) < cls._MAX_IDLE_SESSIONS:
+        idle.append((inst, time.time(), max_idle_seconds))
+      else:
+        inst._close_quietly()
+
+
+# Quit pooled browsers so they do not outlive the interpreter
+atexit.register(KindleCloudReaderAPI.shutdown_pool)